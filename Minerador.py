@@ -1,10 +1,26 @@
 import paho.mqtt.client as mqtt
 import json
 import random
-import time
 import hashlib
+import os
+import socket
+import struct
 import sys
-from threading import Thread
+import multiprocessing
+from collections import OrderedDict
+from threading import Thread, Event, Timer
+
+# Serialização JSON: utiliza 'orjson' (implementação em Rust, opera direto em bytes)
+# quando disponível; caso contrário, recorre ao módulo padrão 'json'.
+# orjson.JSONDecodeError é subclasse de json.JSONDecodeError.
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(data):
+        return json.dumps(data).encode('utf-8')
+    json_loads = json.loads
 
 # ==============================================================================
 # CONFIGURAÇÕES GLOBAIS E CONSTANTES
@@ -15,11 +31,25 @@ from threading import Thread
 # O endereço 'broker.emqx.io' é utilizado aqui para fins de teste e demonstração.
 BROKER_ADDRESS = "broker.emqx.io" 
 BROKER_PORT = 1883
+MQTT_QOS = 0                 # Mensagens efêmeras: o próprio protocolo reenvia o que for necessário
 
 # Parâmetros de Dificuldade e Mineração
 MIN_CHALLENGE = 1            
 MAX_CHALLENGE = 20           
-NONCE_LIMIT = 50000          
+NONCE_LIMIT = 1024           # Nonces por bloco (~0,7–1,3 ms medidos): limita a latência de cancelamento
+MINER_NICENESS = 10          # Prioridade reduzida da mineração perante o loop MQTT
+# CPUs que este processo pode de fato utilizar (respeita cpusets/limites de contêiner)
+if hasattr(os, "sched_getaffinity"):
+    ALLOWED_CPUS = os.sched_getaffinity(0)
+else:
+    ALLOWED_CPUS = set(range(os.cpu_count() or 1))
+# Com afinidade disponível, a CPU permitida de menor índice fica reservada ao
+# loop MQTT e os mineradores ocupam as demais: um processo por CPU restante.
+RESERVE_NETWORK_CPU = hasattr(os, "sched_setaffinity") and len(ALLOWED_CPUS) > 1
+MINER_CPUS = ALLOWED_CPUS - {min(ALLOWED_CPUS)} if RESERVE_NETWORK_CPU else ALLOWED_CPUS
+MINER_WORKERS = len(MINER_CPUS)  # Processos de mineração por desafio
+MINE_BATCH = 16              # Candidatos (nonces) processados por lote
+SHA1_BLOCK_SIZE = 64         # Tamanho (bytes) do bloco processado pelo SHA-1
 
 # Definição dos Tópicos MQTT (Conforme especificação do projeto)
 TOPIC_INIT = "sd/init"
@@ -28,12 +58,35 @@ TOPIC_CHALLENGE = "sd/challenge"
 TOPIC_SOLUTION = "sd/solution"  
 TOPIC_RESULT = "sd/result"      
 
+# Intervalo máximo (s) entre reanúncios nas fases INIT e ELECTION
+REANNOUNCE_INTERVAL = 2
+# Confirmações de presença enviadas após a sincronização (quantidade e intervalo em s)
+INIT_CONFIRMATIONS = 3
+INIT_CONFIRMATION_INTERVAL = 0.2
+# Intervalo (s) antes de cada novo desafio publicado pelo Controlador
+CHALLENGE_DELAY = 2
+
 # Definição dos Estados do Sistema (Máquina de Estados)
 STATE_INIT = "Init"
 STATE_ELECTION = "Election"
 STATE_CHALLENGE = "Challenge"
 STATE_RUNNING = "Running"
 
+# Quantidade máxima de transações mantidas na tabela local (as mais recentes)
+TRANSACTIONS_LIMIT = 1024
+
+# Faixa de identificadores (ClientID) dos participantes
+MAX_CLIENT_ID = 65535
+# Faixa de TransactionID representável no envelope binário (uint32)
+MAX_TRANSACTION_ID = 2**32 - 1
+
+# Envelopes binários dos tópicos de alta frequência (sd/solution e sd/result).
+# Cabeçalho little-endian seguido da Solution ("TransactionID:Nonce") em ASCII:
+#   solution: ClientID (uint16), TransactionID (uint32)
+#   result:   ClientID (uint16), TransactionID (uint32), Result (uint8)
+SOLUTION_HEADER = struct.Struct('<HI')
+RESULT_HEADER = struct.Struct('<HIB')
+
 # Códigos de Status
 WINNER_PENDING = -1             
 RESULT_INVALID = 0              
@@ -43,53 +96,185 @@ RESULT_VALID = 1
 # FUNÇÕES AUXILIARES E CLASSES
 # ==============================================================================
 
+def is_valid_client_id(client_id):
+    """Confere se o ClientID recebido pertence à faixa [0, MAX_CLIENT_ID]."""
+    return isinstance(client_id, int) and 0 <= client_id <= MAX_CLIENT_ID
+
+def is_valid_transaction_id(transaction_id):
+    """Confere se o TransactionID recebido pertence à faixa [0, MAX_TRANSACTION_ID]."""
+    return isinstance(transaction_id, int) and 0 <= transaction_id <= MAX_TRANSACTION_ID
+
+def _pack_solution(client_id, transaction_id, solution):
+    return SOLUTION_HEADER.pack(client_id, transaction_id) + solution.encode('ascii')
+
+def _unpack_solution(payload):
+    client_id, transaction_id = SOLUTION_HEADER.unpack_from(payload)
+    solution = payload[SOLUTION_HEADER.size:].decode('ascii')
+    return {"ClientID": client_id, "TransactionID": transaction_id, "Solution": solution}
+
+def _pack_result(winner_id, transaction_id, solution, result):
+    return RESULT_HEADER.pack(winner_id, transaction_id, result) + solution.encode('ascii')
+
+def _unpack_result(payload):
+    winner_id, transaction_id, result = RESULT_HEADER.unpack_from(payload)
+    solution = payload[RESULT_HEADER.size:].decode('ascii')
+    return {"ClientID": winner_id, "TransactionID": transaction_id, "Solution": solution, "Result": result}
+
+# Decodificadores por tópico; tópicos ausentes utilizam JSON
+MESSAGE_DECODERS = {TOPIC_SOLUTION: _unpack_solution, TOPIC_RESULT: _unpack_result}
+
+def check_solution_bytes(challenge, buf):
+    """
+    Verifica a validade de uma solução já codificada em bytes (Proof of Work).
+    A validação consiste em conferir se o hash SHA-1 do buffer inicia com
+    uma quantidade de zeros igual ao parâmetro 'challenge'.
+    """
+    digest = hashlib.sha1(buf).digest()
+    return digest.hex(), has_leading_zeros(digest, challenge)
+
+def has_leading_zeros(digest, challenge):
+    """
+    Confere os zeros iniciais diretamente sobre o digest bruto, sem conversão
+    para hexadecimal: interpretado como inteiro de 160 bits, o digest inicia
+    com 'challenge' zeros hexadecimais se for nulo após descartar seus
+    160 - 4 * challenge bits menos significativos.
+    """
+    shift = max(8 * len(digest) - 4 * challenge, 0)
+    return int.from_bytes(digest, 'big') >> shift == 0
+
 def check_solution(challenge, solution_string):
     """
     Verifica a validade de uma solução proposta para o desafio (Proof of Work).
-    A validação consiste em conferir se o hash SHA-1 da string inicia com
-    uma quantidade de zeros igual ao parâmetro 'challenge'.
+    Versão para strings, utilizada pelo Controlador na validação das soluções recebidas.
+    """
+    return check_solution_bytes(challenge, solution_string.encode('utf-8'))
+
+def build_batch_checker(challenge):
+    """
+    Gera, para a dificuldade informada, uma função check_solution_batch(digests)
+    especializada: as comparações sobre o digest bruto (20 bytes) ficam fixas
+    no código gerado, sem parâmetros nem desvios dependentes do desafio.
+    Cada byte nulo equivale a dois zeros hexadecimais e, em dificuldades
+    ímpares, o byte seguinte deve ser < 0x10. A função retorna o índice do
+    primeiro digest válido do lote, ou -1 caso nenhum seja válido.
+    """
+    full_zero_bytes = challenge // 2
+    conditions = []
+    if full_zero_bytes:
+        conditions.append(f"d[:{full_zero_bytes}] == {bytes(full_zero_bytes)!r}")
+    if challenge & 1:
+        conditions.append(f"d[{full_zero_bytes}] < 0x10")
+    source = (
+        "def check_solution_batch(digests):\n"
+        "    for i, d in enumerate(digests):\n"
+        f"        if {' and '.join(conditions) or 'True'}:\n"
+        "            return i\n"
+        "    return -1\n"
+    )
+    namespace = {}
+    exec(source, namespace)
+    return namespace["check_solution_batch"]
+
+def solution_prefix(transaction_id):
     """
-    target = '0' * challenge
-    hash_value = hashlib.sha1(solution_string.encode('utf-8')).hexdigest()
-    return hash_value, hash_value.startswith(target)
+    Gera o prefixo "TransactionID:" das soluções candidatas, com o TransactionID
+    completado com zeros à esquerda até ocupar exatamente um bloco do SHA-1.
+    Assim o estado do hash após o prefixo é o mesmo para todos os nonces.
+    """
+    return f"{transaction_id}:".encode('ascii').rjust(SHA1_BLOCK_SIZE, b'0')
 
-class MineradorThread(Thread):
+def mine_range(prefix, check_batch, start, stop):
+    """
+    Núcleo da mineração: testa os nonces do intervalo [start, stop) em lotes,
+    verificados por 'check_batch' (ver build_batch_checker), e retorna o primeiro
+    nonce válido, ou -1 caso o intervalo não contenha solução.
+    O prefixo deve ocupar blocos completos do SHA-1 (ver solution_prefix).
+    """
+    # O prefixo é processado uma única vez; cada tentativa copia esse estado
+    # intermediário (midstate) e processa apenas o nonce.
+    copy = hashlib.sha1(prefix).copy
+    # Alias local evita a busca da constante global a cada lote
+    batch = MINE_BATCH
+    for base in range(start, stop, batch):
+        end = min(base + batch, stop)
+        digests = []
+        for n in range(base, end):
+            h = copy()
+            h.update(b'%d' % n)
+            digests.append(h.digest())
+        hit = check_batch(digests)
+        if hit >= 0:
+            return base + hit
+    return -1
+
+class MineradorProcess(multiprocessing.Process):
     """
-    Thread dedicada à execução do algoritmo de mineração (Brute Force).
-    Separa o processamento pesado da lógica de comunicação MQTT para evitar
-    bloqueios e desconexões por timeout.
+    Processo dedicado à execução do algoritmo de mineração (Brute Force).
+    Cada processo possui interpretador e GIL próprios, permitindo que vários
+    mineradores de um mesmo desafio ocupem núcleos distintos. A comunicação
+    com o nó é feita apenas pela fila de resultados e pelo evento de parada.
     """
-    def __init__(self, participant, transaction_id, challenge):
-        Thread.__init__(self)
-        self.participant = participant
+    def __init__(self, client_id, transaction_id, challenge, result_queue, stop_event, worker_id, worker_count):
+        multiprocessing.Process.__init__(self, daemon=True)
+        self.client_id = client_id
         self.transaction_id = transaction_id
         self.challenge = challenge
-        self.running = True
-        print(f"[{self.participant.client_id}] [MINER] Iniciando mineração. Transação: {transaction_id} | Dificuldade: {challenge}")
+        self.result_queue = result_queue
+        self.stop_event = stop_event
+        self.worker_id = worker_id
+        self.worker_count = worker_count
+        # Invariante do laço de mineração, calculado uma única vez.
+        # Formato da solução candidata: "TransactionID:Nonce", com o TransactionID
+        # completado com zeros à esquerda; a cada tentativa apenas o nonce é processado.
+        self._prefix = solution_prefix(transaction_id)
+
+    def _lower_priority(self):
+        """
+        Cede CPU ao loop de rede via escalonador do SO, em vez de pausas no laço:
+        reduz a prioridade (nice) e, havendo mais de uma CPU permitida, restringe o
+        processo a MINER_CPUS, reservando a restante para a thread do Paho, que
+        permanece no processo principal.
+        """
+        if hasattr(os, "nice"):
+            try:
+                os.nice(MINER_NICENESS)
+            except OSError:
+                pass
+        if RESERVE_NETWORK_CPU:
+            try:
+                os.sched_setaffinity(0, MINER_CPUS)
+            except OSError:
+                pass
 
     def run(self):
         """Executa o loop de busca pelo Nonce (Proof of Work)."""
-        nonce = 0 
-        while self.running:
-            # Formato da solução candidata: "TransactionID:Nonce"
-            test_string = f"{self.transaction_id}:{nonce}" 
-            hash_result, is_valid = check_solution(self.challenge, test_string)
+        self._lower_priority()
+        # Verificador especializado para a dificuldade deste desafio. É gerado
+        # aqui, no processo filho, pois funções criadas via exec não são serializáveis.
+        check_batch = build_batch_checker(self.challenge)
+        # O espaço de nonces é dividido em blocos curtos de NONCE_LIMIT,
+        # intercalados entre os processos do desafio: o processo 'worker_id'
+        # percorre os blocos worker_id, worker_id + worker_count, ... — sem
+        # estado compartilhado nem locks. O cancelamento é verificado entre blocos.
+        nonce = self.worker_id * NONCE_LIMIT
+        stride = self.worker_count * NONCE_LIMIT
+        while not self.stop_event.is_set():
+            found = mine_range(self._prefix, check_batch, nonce, nonce + NONCE_LIMIT)
             
-            if is_valid:
-                print(f"[{self.participant.client_id}] [MINER] Solução encontrada. Hash: {hash_result}")
-                self.participant._publish_solution(self.transaction_id, test_string)
-                self.running = False
+            if found >= 0:
+                test_string = self._prefix.decode('ascii') + str(found)
+                hash_result, _ = check_solution(self.challenge, test_string)
+                print(f"[{self.client_id}] [MINER] Solução encontrada. Hash: {hash_result}")
+                self.result_queue.put((self.transaction_id, test_string))
+                # Encerra também os demais processos do mesmo desafio
+                self.stop_event.set()
                 break
             
-            nonce += 1
-            # Pausa estratégica para evitar 100% de uso da CPU (Starvation)
-            if nonce % NONCE_LIMIT == 0:
-                time.sleep(0.001)
+            nonce += stride
 
     def stop(self):
-        """Interrompe a execução da thread de mineração."""
-        self.running = False
-        print(f"[{self.participant.client_id}] [MINER] Processo de mineração interrompido.")
+        """Sinaliza a interrupção do processo de mineração."""
+        self.stop_event.set()
 
 class Participante:
     """
@@ -110,67 +295,97 @@ class Participante:
         self.current_transaction_id = 0
         
         # Estruturas de Dados em Memória
-        self.known_participants = set()       
+        # Máscaras de bits indexadas pelo ClientID: pertinência e contagem em O(1)
+        self.known_mask = 0                   
+        self.votes_mask = 0                   
         self.election_votes = {}              
-        self.transactions_table = {}          
-        self.active_miner = None              
+        self.transactions_table = OrderedDict()
+        self.active_miners = []               
+        self._transition_event = Event()      # Sinaliza novos pares/votos ao loop principal
+        self.solution_queue = multiprocessing.Queue()
         
         # Configuração do Cliente MQTT com ID único aleatório
         paho_client_id = f"NodeClient_{random.randint(10000, 99999)}"
         self.mqtt_client = self._setup_mqtt_client(paho_client_id)
+        
+        # Tabela de despacho tópico -> handler. O tópico de soluções só é
+        # registrado no nó eleito Controlador (ver _elect_leader).
+        self._handlers = {
+            TOPIC_INIT: self._handle_init_message,
+            TOPIC_ELECTION: self._handle_election_message,
+            TOPIC_CHALLENGE: self._handle_challenge_message_miner,
+            TOPIC_RESULT: self._handle_result_message_miner,
+        }
 
     def _setup_mqtt_client(self, paho_client_id):
         """Configura a instância do cliente MQTT com callbacks e protocolo v3.1.1."""
         client = mqtt.Client(client_id=paho_client_id, protocol=mqtt.MQTTv311)
         client.on_connect = self.on_connect
         client.on_message = self.on_message
+        # Sem limite de mensagens em trânsito ou enfileiradas (0 = ilimitado)
+        client.max_inflight_messages_set(0)
+        client.max_queued_messages_set(0)
         return client
 
     def start(self):
         """Inicia o ciclo de vida do nó participante."""
         print(f"--- Sistema Iniciado. Aguardando {self.N_participants} participantes ---")
         try:
+            # Leitor das soluções produzidas pelos processos de mineração
+            Thread(target=self._solution_reader, daemon=True).start()
+            
             self.mqtt_client.connect(self.broker_address, self.port, 60)
             self.mqtt_client.loop_start() 
             
             # Loop Principal: Gerenciamento de Estados
+            # Reanuncia imediatamente quando um callback sinaliza novidade
+            # (novo par, novo voto, mudança de fase); o intervalo fixo é
+            # apenas um keepalive para mensagens perdidas.
             while True: 
-                if self.state == STATE_INIT:
-                    self._republish_init_message()
-                elif self.state == STATE_ELECTION:
-                    self._republish_election_message()
-                
-                # Aguarda eventos assíncronos (Callbacks MQTT)
-                time.sleep(2) 
+                self._transition_event.wait(timeout=REANNOUNCE_INTERVAL)
+                self._transition_event.clear()
+                self._republish_current_state()
 
         except Exception as e:
             print(f"[ERRO CRÍTICO] Falha na execução: {e}")
             self.mqtt_client.loop_stop()
 
+    def _republish_current_state(self):
+        """Reenvia a mensagem correspondente à fase atual do nó."""
+        if self.state == STATE_INIT:
+            self._republish_init_message()
+        elif self.state == STATE_ELECTION:
+            self._republish_election_message()
+
     # --- MÉTODOS DE COMUNICAÇÃO (PUBLISH) ---
     def _publish(self, topic, data):
         """Método utilitário para publicar mensagens em formato JSON."""
-        payload = json.dumps(data)
-        self.mqtt_client.publish(topic, payload)
+        self._publish_payload(topic, json_dumps(data))
+
+    def _publish_payload(self, topic, payload):
+        """Publica um payload já serializado (JSON ou envelope binário)."""
+        self.mqtt_client.publish(topic, payload, qos=MQTT_QOS)
         
     def _publish_challenge(self, transaction_id, challenge):
         msg = {"TransactionID": transaction_id, "Challenge": challenge}
         self._publish(TOPIC_CHALLENGE, msg)
 
     def _publish_solution(self, transaction_id, solution):
-        msg = {"ClientID": self.client_id, "TransactionID": transaction_id, "Solution": solution}
-        self._publish(TOPIC_SOLUTION, msg)
+        self._publish_payload(TOPIC_SOLUTION, _pack_solution(self.client_id, transaction_id, solution))
 
     def _publish_result(self, winner_id, transaction_id, solution, result):
-        msg = {"ClientID": winner_id, "TransactionID": transaction_id, "Solution": solution, "Result": result}
-        self._publish(TOPIC_RESULT, msg)
+        self._publish_payload(TOPIC_RESULT, _pack_result(winner_id, transaction_id, solution, result))
 
     # --- CALLBACKS MQTT (EVENT HANDLERS) ---
     def on_connect(self, client, userdata, flags, rc):
         if rc == 0:
             print(f"[SISTEMA] Conexão com Broker estabelecida. Iniciando fase {STATE_INIT}.")
+            # Desativa o algoritmo de Nagle: mensagens pequenas seguem sem atraso de agrupamento
+            sock = client.socket()
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             # Subscrição em todos os tópicos relevantes
-            topics = [(TOPIC_INIT, 0), (TOPIC_ELECTION, 0), (TOPIC_CHALLENGE, 0), (TOPIC_SOLUTION, 0), (TOPIC_RESULT, 0)]
+            topics = [(TOPIC_INIT, MQTT_QOS), (TOPIC_ELECTION, MQTT_QOS), (TOPIC_CHALLENGE, MQTT_QOS), (TOPIC_SOLUTION, MQTT_QOS), (TOPIC_RESULT, MQTT_QOS)]
             self.mqtt_client.subscribe(topics)
             self.run_init_state() 
         else:
@@ -178,22 +393,19 @@ class Participante:
 
     def on_message(self, client, userdata, msg):
         """Roteador de mensagens recebidas (Message Dispatcher)."""
+        handler = self._handlers.get(msg.topic)
+        if handler is None: return
         try:
-            data = json.loads(msg.payload.decode('utf-8'))
-            
-            if msg.topic == TOPIC_INIT:
-                self._handle_init_message(data)
-            elif msg.topic == TOPIC_ELECTION:
-                self._handle_election_message(data)
-            elif msg.topic == TOPIC_CHALLENGE:
-                self._handle_challenge_message_miner(data)
-            elif msg.topic == TOPIC_SOLUTION and self.is_leader: 
-                self._handle_solution_message_controller(data)
-            elif msg.topic == TOPIC_RESULT: 
-                self._handle_result_message_miner(data)
+            # sd/solution e sd/result usam envelope binário; os demais tópicos, JSON
+            data = MESSAGE_DECODERS.get(msg.topic, json_loads)(msg.payload)
+            handler(data)
                 
         except json.JSONDecodeError:
             print(f"[{self.client_id}] [ERRO] Formato de mensagem inválido (Não é JSON).")
+        except (struct.error, UnicodeDecodeError):
+            # UnicodeDecodeError também surge do 'json' padrão em payloads não UTF-8
+            formato = "Envelope binário malformado" if msg.topic in MESSAGE_DECODERS else "Não é JSON"
+            print(f"[{self.client_id}] [ERRO] Formato de mensagem inválido ({formato}).")
         except Exception as e:
             print(f"[{self.client_id}] [ERRO] Exceção no processamento: {e}")
             
@@ -201,50 +413,63 @@ class Participante:
     def run_init_state(self):
         self.state = STATE_INIT
         if self.client_id is None:
-            self.client_id = random.randint(0, 65535)
+            self.client_id = random.randint(0, MAX_CLIENT_ID)
             print(f"[INIT] Identificador Local (ClientID) gerado: {self.client_id}")
-            self.known_participants.add(self.client_id) 
+            self.known_mask |= 1 << self.client_id
+        self._transition_event.set()
         
     def _republish_init_message(self):
         """Reenvia periodicamente a mensagem de presença até a sincronização."""
         if self.state == STATE_INIT:
             msg = {"ClientID": self.client_id}
             self._publish(TOPIC_INIT, msg)
-            print(f"[INIT] Aguardando pares... Sincronizados: {len(self.known_participants)}/{self.N_participants}")
+            print(f"[INIT] Aguardando pares... Sincronizados: {self.known_mask.bit_count()}/{self.N_participants}")
         
     def _handle_init_message(self, data):
         if self.state != STATE_INIT: return
         received_id = data.get("ClientID")
         
-        if received_id is None: return
+        if not is_valid_client_id(received_id): return
         
-        if received_id not in self.known_participants:
-            self.known_participants.add(received_id)
+        bit = 1 << received_id
+        if not self.known_mask & bit:
+            self.known_mask |= bit
             print(f"[{self.client_id}] Novo participante detectado: {received_id}.")
+            self._transition_event.set()
         
         # Verifica critério de transição de estado (Sincronização completa)
-        if len(self.known_participants) >= self.N_participants:
+        if self.known_mask.bit_count() >= self.N_participants:
             print(f"\n[INIT] Sincronização concluída. Iniciando fase de Eleição.")
             
-            # Envia confirmações adicionais para garantir consistência na rede
-            for _ in range(3):
-                self._publish(TOPIC_INIT, {"ClientID": self.client_id})
-                time.sleep(0.2)
+            # Envia confirmações adicionais para garantir consistência na rede.
+            # São agendadas em Timer para não bloquear a thread de callbacks do Paho.
+            self._send_init_confirmation(INIT_CONFIRMATIONS)
                 
             self.run_election_state()
 
+    def _send_init_confirmation(self, remaining):
+        """Publica uma confirmação de presença e agenda as restantes."""
+        self._publish(TOPIC_INIT, {"ClientID": self.client_id})
+        if remaining > 1:
+            timer = Timer(INIT_CONFIRMATION_INTERVAL, self._send_init_confirmation, args=(remaining - 1,))
+            timer.daemon = True
+            timer.start()
+
     # --- ESTADO II: ELEIÇÃO ---
     def run_election_state(self):
         self.state = STATE_ELECTION
         print(f"\n[{self.client_id}] [ELECTION] Estado de Eleição iniciado.")
         self.election_votes = {} 
+        self.votes_mask = 0
+        self._transition_event.set()
         
     def _republish_election_message(self):
         if self.state == STATE_ELECTION:
             # Gera voto local caso não exista
-            if self.client_id not in self.election_votes:
+            if not self.votes_mask & (1 << self.client_id):
                  vote_id = random.randint(0, 65535)
                  self.election_votes[self.client_id] = vote_id
+                 self.votes_mask |= 1 << self.client_id
             
             vote_id = self.election_votes.get(self.client_id)
             msg = {"ClientID": self.client_id, "VoteID": vote_id}
@@ -256,14 +481,17 @@ class Participante:
         received_client_id = data.get("ClientID")
         received_vote_id = data.get("VoteID")
         
-        if received_client_id is None or received_vote_id is None: return
+        if not is_valid_client_id(received_client_id) or received_vote_id is None: return
 
-        if received_client_id not in self.election_votes:
+        bit = 1 << received_client_id
+        if not self.votes_mask & bit:
+            self.votes_mask |= bit
             self.election_votes[received_client_id] = received_vote_id
-            print(f"[{self.client_id}] Voto registrado de {received_client_id}. Computados: {len(self.election_votes)}/{self.N_participants}")
+            print(f"[{self.client_id}] Voto registrado de {received_client_id}. Computados: {self.votes_mask.bit_count()}/{self.N_participants}")
+            self._transition_event.set()
 
         # Verifica se todos os votos foram coletados
-        if len(self.election_votes) >= self.N_participants:
+        if self.votes_mask.bit_count() >= self.N_participants:
             print(f"\n[ELECTION] Votação encerrada. Apurando resultados...")
             self._elect_leader()
             
@@ -273,17 +501,13 @@ class Participante:
         Critério Primário: Maior VoteID.
         Critério de Desempate: Maior ClientID.
         """
-        current_leader_criteria = (-1, -1) 
-        leader_id = -1
-        
-        for client_id, vote_id in self.election_votes.items():
-            criteria = (vote_id, client_id)
-            if criteria > current_leader_criteria:
-                current_leader_criteria = criteria
-                leader_id = client_id
+        # A ordenação natural das tuplas (VoteID, ClientID) aplica ambos os critérios
+        _, leader_id = max((vote_id, client_id) for client_id, vote_id in self.election_votes.items())
                 
         self.leader_id = leader_id
         self.is_leader = (self.client_id == self.leader_id)
+        if self.is_leader:
+            self._handlers[TOPIC_SOLUTION] = self._handle_solution_message_controller
         
         papel = 'CONTROLADOR' if self.is_leader else 'MINERADOR'
         print(f"[{self.client_id}] [ELECTION] Resultado: Líder {self.leader_id}. Papel assumido: {papel}.")
@@ -291,12 +515,18 @@ class Participante:
         
     # --- ESTADO III & IV: OPERAÇÃO (CONTROLADOR/MINERADOR) ---
     def _update_transaction_table(self, tx_id, challenge, solution, winner):
-        """Atualiza a tabela local de transações (Ledger)."""
+        """
+        Atualiza a tabela local de transações (Ledger). Apenas as TRANSACTIONS_LIMIT
+        transações mais recentes são mantidas; as antigas nunca são revisitadas.
+        """
         self.transactions_table[tx_id] = {
             'Challenge': challenge,
             'Solution': solution,
             'Winner': winner
         }
+        self.transactions_table.move_to_end(tx_id)
+        if len(self.transactions_table) > TRANSACTIONS_LIMIT:
+            self.transactions_table.popitem(last=False)
 
     def _generate_next_challenge(self):
         """Lógica do Controlador: Gera e publica novos desafios."""
@@ -310,14 +540,22 @@ class Participante:
         print(f"\n[CONTROLADOR] Publicando novo desafio. ID: T{new_tx_id} | Dificuldade: {challenge_value}")
         self._publish_challenge(new_tx_id, challenge_value)
 
+    def _schedule_next_challenge(self):
+        """
+        Agenda o próximo desafio após CHALLENGE_DELAY segundos em um Timer,
+        sem bloquear a thread de callbacks do Paho durante a espera.
+        """
+        timer = Timer(CHALLENGE_DELAY, self._generate_next_challenge)
+        timer.daemon = True
+        timer.start()
+
     def run_challenge_state(self):
         self.state = STATE_RUNNING 
 
         if self.is_leader:
             # Controlador inicia o ciclo de transações
             self.current_transaction_id = -1 
-            time.sleep(2) # Aguarda estabilização da rede
-            self._generate_next_challenge() 
+            self._schedule_next_challenge() # Aguarda estabilização da rede
         else:
             print(f"[{self.client_id}] [MINER] Aguardando desafios do Controlador...")
 
@@ -346,31 +584,34 @@ class Participante:
             self._publish_result(client_id, transaction_id, solution, RESULT_VALID)
             
             # Agenda o próximo desafio
-            time.sleep(2)
-            self._generate_next_challenge()
+            self._schedule_next_challenge()
         else:
             print(f"[{self.client_id}] [CONTROLADOR] Solução INVÁLIDA recebida de {client_id}.")
             self._publish_result(client_id, transaction_id, solution, RESULT_INVALID)
 
     # --- LÓGICA DO MINERADOR ---
     def _handle_challenge_message_miner(self, data):
-        """Recebe novo desafio e instancia a thread de mineração."""
+        """Recebe novo desafio e inicia os processos de mineração."""
         if self.is_leader: return 
         
         transaction_id = data.get("TransactionID")
         challenge = data.get("Challenge")
         
+        # Desafios fora do formato não podem ser minerados nem publicados no envelope binário
+        if not is_valid_transaction_id(transaction_id) or not isinstance(challenge, int) \
+                or not MIN_CHALLENGE <= challenge <= MAX_CHALLENGE:
+            print(f"[{self.client_id}] [ERRO] Desafio inválido ignorado: {data}")
+            return
+        
         print(f"[{self.client_id}] [MINER] Desafio recebido: T{transaction_id} (Dificuldade: {challenge})")
         
         # Interrompe mineração anterior se ainda estiver ativa
-        if self.active_miner and self.active_miner.is_alive():
-            self.active_miner.stop()
+        self._stop_miners()
             
         self._update_transaction_table(transaction_id, challenge, "", WINNER_PENDING)
         
-        # Inicia Thread de Mineração (Non-blocking)
-        self.active_miner = MineradorThread(self, transaction_id, challenge)
-        self.active_miner.start()
+        # Inicia os Processos de Mineração (Non-blocking)
+        self._start_miners(transaction_id, challenge)
             
     def _handle_result_message_miner(self, data):
         """Recebe o resultado da validação do Controlador."""
@@ -383,8 +624,41 @@ class Participante:
             self.transactions_table[transaction_id]['Winner'] = winner_id
             
             # Se este nó estava minerando a transação vencida por outro, interrompe o trabalho
-            if self.active_miner and self.active_miner.transaction_id == transaction_id:
-                self.active_miner.stop()
+            if self.active_miners and self.active_miners[0].transaction_id == transaction_id:
+                self._stop_miners()
+
+    def _start_miners(self, transaction_id, challenge):
+        """Divide o desafio entre MINER_WORKERS processos que compartilham o evento de parada."""
+        print(f"[{self.client_id}] [MINER] Iniciando mineração. Transação: {transaction_id} | Dificuldade: {challenge} | Processos: {MINER_WORKERS}")
+        stop_event = multiprocessing.Event()
+        self.active_miners = [
+            MineradorProcess(self.client_id, transaction_id, challenge, self.solution_queue, stop_event, worker_id, MINER_WORKERS)
+            for worker_id in range(MINER_WORKERS)
+        ]
+        for miner in self.active_miners:
+            miner.start()
+
+    def _stop_miners(self):
+        """Interrompe os processos de mineração ativos, se houver."""
+        if any(miner.is_alive() for miner in self.active_miners):
+            for miner in self.active_miners:
+                miner.stop()
+            print(f"[{self.client_id}] [MINER] Processo de mineração interrompido.")
+        self.active_miners = []
+
+    def _solution_reader(self):
+        """Publica as soluções encontradas pelos processos de mineração (uma por transação)."""
+        while True:
+            transaction_id, solution = self.solution_queue.get()
+            miners = self.active_miners
+            if not miners or miners[0].transaction_id != transaction_id:
+                continue
+            self.active_miners = []
+            # Uma falha de publicação não pode encerrar o leitor
+            try:
+                self._publish_solution(transaction_id, solution)
+            except Exception as e:
+                print(f"[{self.client_id}] [ERRO] Falha ao publicar solução de T{transaction_id}: {e}")
 
 # ==============================================================================
 # EXECUÇÃO PRINCIPAL (MAIN)